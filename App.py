@@ -1,10 +1,14 @@
-import json
 import time
+import msgspec
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
 import streamlit as st
-import websocket
+import asyncio
+import websockets
 import threading
+from functools import lru_cache
+
+from _indicators_njit import rsi_macd
 
 # -----------------------------
 # Config
@@ -16,58 +20,237 @@ ASSETS = [
     {"symbol": "zecusdt", "label": "Zcash"},
 ]
 
-# Global storage for live prices
-price_buffers = {a["symbol"]: [] for a in ASSETS}
+# Global storage for live prices: preallocated ring buffers per symbol.
+# Timestamps (ms) and prices live in two flat arrays, so a tick costs two
+# scalar stores instead of a dict allocation, and readers get contiguous
+# float64/int64 arrays without rebuilding Python objects.
+BUF_SIZE = 500
+
+RSI_LEN = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIG = 9
+
+def _new_state():
+    # Running EMA/RMA state so indicators advance in O(1) per tick instead
+    # of being recomputed over the whole buffer on every render.
+    return {
+        "ema_fast": 0.0,
+        "ema_slow": 0.0,
+        "sig": 0.0,
+        "gain": 0.0,
+        "loss": 0.0,
+        "prev_close": 0.0,
+        "ticks": 0,
+    }
+
+price_buffers = {
+    a["symbol"]: {
+        "ts": np.empty(BUF_SIZE, dtype=np.int64),
+        "px": np.empty(BUF_SIZE, dtype=np.float64),
+        "i": 0,  # next write position
+        "n": 0,  # number of valid points (caps at BUF_SIZE)
+        "state": _new_state(),
+        "lock": threading.Lock(),
+    }
+    for a in ASSETS
+}
+
+def _update_state(state, price):
+    ticks = state["ticks"]
+    if ticks == 0:
+        state["ema_fast"] = price
+        state["ema_slow"] = price
+    else:
+        delta = price - state["prev_close"]
+        gain = delta if delta > 0.0 else 0.0
+        loss = -delta if delta < 0.0 else 0.0
+        if ticks <= RSI_LEN:
+            state["gain"] += gain / RSI_LEN
+            state["loss"] += loss / RSI_LEN
+        else:
+            state["gain"] = (state["gain"] * (RSI_LEN - 1) + gain) / RSI_LEN
+            state["loss"] = (state["loss"] * (RSI_LEN - 1) + loss) / RSI_LEN
+        state["ema_fast"] += (2.0 / (MACD_FAST + 1)) * (price - state["ema_fast"])
+        state["ema_slow"] += (2.0 / (MACD_SLOW + 1)) * (price - state["ema_slow"])
+        macd = state["ema_fast"] - state["ema_slow"]
+        if ticks == MACD_SLOW - 1:
+            state["sig"] = macd
+        elif ticks >= MACD_SLOW:
+            state["sig"] += (2.0 / (MACD_SIG + 1)) * (macd - state["sig"])
+    state["prev_close"] = price
+    state["ticks"] = ticks + 1
+
+def latest_indicators(symbol):
+    """Current indicator scalars for a symbol, advanced tick-by-tick."""
+    state = price_buffers[symbol]["state"]
+    if state["ticks"] <= max(RSI_LEN, MACD_SLOW + MACD_SIG - 1):
+        return {}
+    macd = state["ema_fast"] - state["ema_slow"]
+    rsi = 100.0 if state["loss"] == 0.0 else 100.0 - 100.0 / (1.0 + state["gain"] / state["loss"])
+    return {
+        "price": state["prev_close"],
+        "rsi": rsi,
+        "macd": macd,
+        "macd_signal": state["sig"],
+        "macd_hist": macd - state["sig"],
+    }
+
+def buffer_arrays(symbol):
+    """Snapshot a symbol's ring buffer as (timestamps_ms, prices) in order."""
+    buf = price_buffers[symbol]
+    # Array stores are not atomic like deque.append, so take the symbol lock
+    # for the copy to keep the socket thread from tearing a render snapshot.
+    with buf["lock"]:
+        n, i = buf["n"], buf["i"]
+        if n < BUF_SIZE:
+            return buf["ts"][:n].copy(), buf["px"][:n].copy()
+        return (
+            np.concatenate([buf["ts"][i:], buf["ts"][:i]]),
+            np.concatenate([buf["px"][i:], buf["px"][:i]]),
+        )
 
 # -----------------------------
 # WebSocket handler
 # -----------------------------
-def on_message(ws, message):
-    data = json.loads(message)
-    symbol = data.get("s", "").lower()
-    price = float(data.get("p", 0))
-    ts = pd.to_datetime(data.get("T"), unit="ms")
-    if symbol in price_buffers:
-        price_buffers[symbol].append({"time": ts, "close": price})
-        # keep only last 500 points
-        price_buffers[symbol] = price_buffers[symbol][-500:]
-
-def on_error(ws, error):
-    print("WebSocket error:", error)
-
-def on_close(ws, close_status_code, close_msg):
-    print("WebSocket closed")
+class Trade(msgspec.Struct):
+    # Defaults mirror the old dict.get fallbacks for non-trade frames.
+    s: str = ""
+    p: str = "0"
+    T: int = 0
 
-def run_socket():
+# One reusable typed decoder: materializes a C struct per tick instead of a
+# dict, and skips fields we never read.
+_DECODER = msgspec.json.Decoder(Trade)
+
+def handle_message(message):
+    trade = _DECODER.decode(message)
+    symbol = trade.s.lower()
+    if symbol not in price_buffers:
+        return
+    buf = price_buffers[symbol]
+    # Store the raw ms timestamp; conversion to datetime happens at render time.
+    price = float(trade.p)
+    with buf["lock"]:
+        buf["ts"][buf["i"]] = trade.T
+        buf["px"][buf["i"]] = price
+        buf["i"] = (buf["i"] + 1) % BUF_SIZE
+        buf["n"] = min(buf["n"] + 1, BUF_SIZE)
+        _update_state(buf["state"], price)
+
+async def stream():
     streams = "/".join([f"{a['symbol']}@trade" for a in ASSETS])
     url = f"wss://stream.binance.com:9443/stream?streams={streams}"
-    ws = websocket.WebSocketApp(url, on_message=on_message, on_error=on_error, on_close=on_close)
-    ws.run_forever()
+    # compression=None skips per-frame deflate; async iteration drains
+    # queued frames in bursts instead of one blocking recv per message.
+    async with websockets.connect(url, ping_interval=20, compression=None) as ws:
+        async for message in ws:
+            handle_message(message)
+
+def run_socket():
+    try:
+        asyncio.run(stream())
+    except Exception as error:
+        print("WebSocket error:", error)
+    print("WebSocket closed")
+
+# Start WebSocket in background thread. Streamlit re-executes this script on
+# every rerun, so cache the thread as a resource to spawn it exactly once per
+# session instead of once per rerun.
+@st.cache_resource
+def start_socket_thread():
+    thread = threading.Thread(target=run_socket, daemon=True)
+    thread.start()
+    return thread
 
-# Start WebSocket in background thread
-threading.Thread(target=run_socket, daemon=True).start()
+start_socket_thread()
 
 # -----------------------------
 # Indicators
 # -----------------------------
+@lru_cache(maxsize=128)
+def _cached_rsi_macd(close_bytes, n_rsi=14, fast=12, slow=26, n_sig=9):
+    # tobytes() gives a hashable key, so a rerun that added no new ticks
+    # (e.g. a widget toggle) reuses the previous result instead of rerunning
+    # the kernel over the whole buffer.
+    close = np.frombuffer(close_bytes, dtype=np.float64)
+    return rsi_macd(close, n_rsi, fast, slow, n_sig)
+
 def compute_indicators(df: pd.DataFrame):
     if df.empty:
         return df
-    df["rsi"] = ta.rsi(df["close"], length=14)
-    macd = ta.macd(df["close"], fast=12, slow=26, signal=9)
-    df["macd"] = macd["MACD_12_26_9"]
-    df["macd_signal"] = macd["MACDs_12_26_9"]
-    df["macd_hist"] = macd["MACDh_12_26_9"]
-    # PSAR placeholder (since we only have close)
-    df["psar"] = df["close"].shift(1)
-    return df
+    close = df["close"].to_numpy(dtype=np.float64)
+    rsi, macd, signal, hist = _cached_rsi_macd(close.tobytes())
+    # One assign places all four columns in a single block instead of four
+    # BlockManager inserts. float32 is plenty for display and halves what
+    # Arrow ships to the browser; close stays float64 for downstream math.
+    return df.assign(
+        rsi=rsi.astype(np.float32),
+        macd=macd.astype(np.float32),
+        macd_signal=signal.astype(np.float32),
+        macd_hist=hist.astype(np.float32),
+    )
+
+def buffer_dataframe(symbol):
+    """Full indicator DataFrame for a symbol's buffer.
+
+    This is the chart/table path: it materializes the whole history with
+    indicator columns. Metric-only renders should call latest_indicators()
+    instead, which returns the current scalars without building a frame.
+    """
+    ts, px = buffer_arrays(symbol)
+    # Index on time at construction so chart calls can select columns
+    # directly instead of paying a set_index copy per render.
+    df = pd.DataFrame({"close": px}, index=pd.to_datetime(ts, unit="ms"))
+    df.index.name = "time"
+    return compute_indicators(df)
+
+def compute_all_symbols():
+    """Run the indicator kernel for every asset in one batch pass.
+
+    Snapshots each buffer once and returns {symbol: arrays}, so the render
+    pass only reads precomputed arrays instead of interleaving compute with
+    widget emission per asset.
+    """
+    out = {}
+    for a in ASSETS:
+        symbol = a["symbol"]
+        ts, px = buffer_arrays(symbol)
+        rsi, macd, signal, hist = _cached_rsi_macd(px.tobytes())
+        out[symbol] = {
+            "ts": ts,
+            "close": px,
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": signal,
+            "macd_hist": hist,
+        }
+    return out
 
 def confirmation_bundle(df: pd.DataFrame):
     if df.empty:
         return {}
-    latest = df.iloc[-1]
-    prev = df.iloc[-2] if len(df) > 1 else latest
-    rsi = latest["rsi"]
+    # Read the tails straight from the column arrays; iloc[-1]/iloc[-2]
+    # would allocate an object-dtype Series per row just to read two floats.
+    cols = {c: df[c].to_numpy() for c in ("close", "rsi", "macd", "macd_signal", "macd_hist")}
+    prev = -2 if len(df) > 1 else -1
+    close = cols["close"]
+    rsi = cols["rsi"][-1]
+    macd_prev, macd_now = cols["macd"][prev], cols["macd"][-1]
+    sig_prev, sig_now = cols["macd_signal"][prev], cols["macd_signal"][-1]
 
-    macd_cross_up = (prev["macd"] < prev["macd_signal"]) and (latest["macd"] > latest["macd_signal"])
-    macd_cross_down = (prev["macd"] > prev["macd_signal"])
+    macd_cross_up = (macd_prev < sig_prev) and (macd_now > sig_now)
+    macd_cross_down = (macd_prev > sig_prev) and (macd_now < sig_now)
+    return {
+        "price": close[-1],
+        "rsi": rsi,
+        "macd": macd_now,
+        "macd_signal": sig_now,
+        "macd_hist": cols["macd_hist"][-1],
+        "macd_cross_up": macd_cross_up,
+        "macd_cross_down": macd_cross_down,
+        # PSAR placeholder is just the previous close; compare inline rather
+        # than allocating a shifted copy of the whole column for two values.
+        "price_above_psar": close[-1] > close[prev],
+        "price_below_psar": close[-1] < close[prev],
+    }
@@ -0,0 +1,72 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional: fall back to the plain-Python loop
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(func):
+            return func
+
+        return wrap
+
+
+@njit(cache=True, fastmath=True)
+def rsi_macd(close, n_rsi=14, fast=12, slow=26, n_sig=9):
+    """Fused single-pass RSI (Wilder) + MACD (EMA) over one close array.
+
+    Returns (rsi, macd, macd_signal, macd_hist) as float64 arrays aligned
+    with close; warmup entries are NaN.
+    """
+    n = close.shape[0]
+    rsi = np.full(n, np.nan)
+    macd = np.full(n, np.nan)
+    sig = np.full(n, np.nan)
+    hist = np.full(n, np.nan)
+    if n < 2:
+        return rsi, macd, sig, hist
+
+    a_fast = 2.0 / (fast + 1.0)
+    a_slow = 2.0 / (slow + 1.0)
+    a_sig = 2.0 / (n_sig + 1.0)
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    ema_fast = close[0]
+    ema_slow = close[0]
+    ema_sig = 0.0
+
+    for i in range(1, n):
+        # Wilder's RMA of gains/losses
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0.0 else 0.0
+        loss = -delta if delta < 0.0 else 0.0
+        if i <= n_rsi:
+            avg_gain += gain / n_rsi
+            avg_loss += loss / n_rsi
+        else:
+            avg_gain = (avg_gain * (n_rsi - 1) + gain) / n_rsi
+            avg_loss = (avg_loss * (n_rsi - 1) + loss) / n_rsi
+        if i >= n_rsi:
+            if avg_loss == 0.0:
+                rsi[i] = 100.0
+            else:
+                rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        # MACD from the two EMA recurrences, signal EMA seeded at first MACD
+        ema_fast += a_fast * (close[i] - ema_fast)
+        ema_slow += a_slow * (close[i] - ema_slow)
+        if i >= slow - 1:
+            m = ema_fast - ema_slow
+            macd[i] = m
+            if i == slow - 1:
+                ema_sig = m
+            else:
+                ema_sig += a_sig * (m - ema_sig)
+            if i >= slow + n_sig - 2:
+                sig[i] = ema_sig
+                hist[i] = m - ema_sig
+
+    return rsi, macd, sig, hist